@@ -6,227 +6,544 @@
 """
 
 import argparse
+import asyncio
 import csv
+import functools
+import glob
 import os
+import re
 import sys
 import json
-from typing import List, Dict, Any
-from openai import OpenAI
+import logging
+import hashlib
+import html
+import shutil
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from operator import itemgetter
+from string import Template
+from typing import List, Dict, Any, Iterable, Iterator, Union
+
+log = logging.getLogger("aitutor")
+
+try:
+    import orjson  # 可选依赖，安装后JSON序列化更快
+except ImportError:
+    orjson = None
+
+# 分析所需的CNKI导出列
+PAPER_COLUMNS = (
+    '题名', '作者', '来源', '发表时间', '数据库', '被引', '下载',
+    '摘要', '关键词', '基金资助', 'DOI'
+)
+
+# 关键词、作者字段中的分隔符（半角/全角分号和逗号）
+SEPARATOR_RE = re.compile(r'[;；,，]')
+
+# CSV读取缓冲区大小（16MB），大文件按块批量读入，减少系统调用次数
+CSV_READ_BUFFER_SIZE = 16 << 20
+
+# 提示词中默认附带的示例文献条数
+DEFAULT_MAX_PROMPT_PAPERS = 3
+
+# 提示词中附带的高频关键词条数，供词云和热点分析直接使用
+TOP_KEYWORDS_IN_PROMPT = 50
+
+# 被引次数分布区间：各区间的上界（含）及对应标签，最后一个区间无上界
+CITATION_RANGE_BOUNDS = (0, 5, 10, 20, 50)
+CITATION_RANGE_LABELS = ('0', '1-5', '6-10', '11-20', '21-50', '50+')
+
+# 判断模型输出是否为HTML时只检查开头的这些字符，与输出总长度无关
+HTML_SNIFF_WINDOW = 256
+
+# 写入报告时的缓冲区大小（1MB），流式片段先在缓冲区中合并再落盘
+REPORT_WRITE_BUFFER_SIZE = 1 << 20
+
+# 批量调用API时默认的最大并发请求数
+DEFAULT_API_CONCURRENCY = 8
+
+# 批量分析多个CSV文件时默认的并行线程数
+DEFAULT_MAX_WORKERS = 4
+
+# 每个分析器在内存中缓存的CSV统计结果个数
+STATS_CACHE_SIZE = 8
+
+# 分析报告缓存目录，按CSV内容哈希保存已生成的报告
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'aitutor')
+
+# 提示词模板版本，修改提示词后递增，使旧的缓存报告失效
+PROMPT_VERSION = 3
+
+# 分段生成报告时的各个章节：(章节ID, 导航标题, 本章节的生成要求)
+# 每个章节单独请求一次API，单次输出远低于max_tokens上限，避免整份报告被截断后重新生成
+REPORT_SECTIONS = (
+    ('overview', '📊 数据概览与图表分析', """
+- 关键指标卡片：总文献数、时间跨度、总被引数、平均被引、期刊覆盖、关键词数
+- 发表趋势分析图：Chart.js混合图表（柱状图 + 折线图），年度发文量 + 累计趋势
+- 期刊影响力分析：Chart.js水平柱状图，TOP10期刊发文量
+- 关键词云图：使用wordcloud2.js，按关键词频次绘制
+- 被引分析图表：Chart.js柱状图展示被引分布区间
+- 高产作者分析：Chart.js柱状图展示TOP10作者发文量
+"""),
+    ('literature', '📚 文献库', """
+- 使用DataTables 1.13.6生成文献数据表（中文语言包），支持全文搜索、多列排序、分页显示（每页20条）
+- 表格列：序号 | 题名 | 作者 | 期刊 | 发表时间 | 被引次数 | 下载次数 | 关键词
+- 点击标题展开摘要
+- 表格数据以JavaScript数组形式写在片段内的<script>中，按示例数据结构组织
+"""),
+    ('insights', '💡 统计报告与研究建议', """
+- 研究趋势演变：发文量年度变化、研究热点的兴起和衰落、学科发展阶段判断
+- 期刊与学术影响力分析：核心期刊发文分布、高被引文献特征
+- 研究合作模式：高产作者及其合作关系
+- 创新点识别：新兴关键词发现、研究空白领域识别
+- 智能研究建议：未来研究方向、合作机会、方法论改进
+"""),
+)
+
+# 分段生成时各章节缓存文件所在的子目录，按章节提示词哈希保存已生成的片段
+SECTION_CACHE_DIR = os.path.join(CACHE_DIR, 'sections')
+
+# 分段生成时每个章节最多请求的次数，API返回空内容时重新请求
+SECTION_ATTEMPTS = 2
+
+# 匹配模型输出首尾的Markdown代码块标记（```html ... ```）
+CODE_FENCE_RE = re.compile(r'^\s*```[a-zA-Z]*\s*\n|\n?```\s*$')
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """
+    将对象序列化为JSON字符串，优先使用orjson，未安装时回退到标准库json
+    
+    Args:
+        obj: 要序列化的对象
+        indent: 是否使用2空格缩进，默认输出紧凑格式
+        
+    Returns:
+        JSON字符串（非ASCII字符原样保留）
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+def _split(text: str) -> List[str]:
+    """
+    按分隔符切分关键词、作者等字段，去除首尾空白并丢弃空项
+    
+    Args:
+        text: 原始字段文本
+        
+    Returns:
+        切分后的非空词项列表
+    """
+    return list(filter(None, map(str.strip, SEPARATOR_RE.split(text))))
+
+# 模型未返回HTML时使用的包装页面模板
+HTML_WRAPPER_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>增强版文献数据AI分析报告</title>
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+    <style>
+        body {
+            font-family: 'Microsoft YaHei', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            line-height: 1.6;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+            margin: 0;
+            padding: 20px;
+        }
+        .container {
+            background: rgba(255, 255, 255, 0.95);
+            padding: 40px;
+            border-radius: 15px;
+            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
+            backdrop-filter: blur(10px);
+            max-width: 1200px;
+            margin: 0 auto;
+        }
+        h1 {
+            color: #2c3e50;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 15px;
+            margin-bottom: 30px;
+        }
+        h2 {
+            color: #34495e;
+            margin-top: 40px;
+            margin-bottom: 20px;
+        }
+        .meta-info {
+            background: linear-gradient(45deg, #f39c12, #f1c40f);
+            color: white;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 30px;
+        }
+        .content {
+            background: #f8f9fa;
+            padding: 25px;
+            border-radius: 10px;
+            border-left: 5px solid #3498db;
+        }
+        pre {
+            background: #2c3e50;
+            color: #ecf0f1;
+            padding: 20px;
+            border-radius: 8px;
+            overflow-x: auto;
+            font-size: 14px;
+        }
+        .highlight {
+            background: #3498db;
+            color: white;
+            padding: 2px 6px;
+            border-radius: 4px;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🚀 增强版文献数据AI分析报告</h1>
+        <div class="meta-info">
+            <h3>📋 报告信息</h3>
+            <p><strong>🕒 生成时间:</strong> $timestamp</p>
+            <p><strong>🤖 分析模型:</strong> <span class="highlight">$model</span></p>
+            <p><strong>⚡ 版本:</strong> Enhanced AI Analyzer v2.0</p>
+        </div>
+        <div class="content">
+            <h2>📄 分析内容</h2>
+            <pre>$content</pre>
+        </div>
+        <div class="mt-4 text-center">
+            <p class="text-muted">💡 提示：如果内容不是HTML格式，请检查API响应或重新生成</p>
+        </div>
+    </div>
+</body>
+</html>""")
+
+# 分段生成报告时的外壳页面模板，各章节片段按顺序填入$sections
+SECTIONED_REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>增强版文献数据AI分析报告</title>
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+    <link href="https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.4.0/css/all.min.css" rel="stylesheet">
+    <link href="https://cdn.datatables.net/1.13.6/css/dataTables.bootstrap5.min.css" rel="stylesheet">
+    <script src="https://code.jquery.com/jquery-3.7.0.min.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
+    <script src="https://cdn.datatables.net/1.13.6/js/jquery.dataTables.min.js"></script>
+    <script src="https://cdn.datatables.net/1.13.6/js/dataTables.bootstrap5.min.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/wordcloud@1.2.2/src/wordcloud2.js"></script>
+    <style>
+        body {
+            font-family: 'Microsoft YaHei', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background: linear-gradient(135deg, #0f172a 0%, #1e293b 100%);
+            color: #e2e8f0;
+            min-height: 100vh;
+            padding-top: 70px;
+        }
+        section {
+            background: rgba(255, 255, 255, 0.05);
+            backdrop-filter: blur(10px);
+            border-radius: 15px;
+            padding: 30px;
+            margin-bottom: 30px;
+        }
+    </style>
+</head>
+<body data-bs-theme="dark">
+    <nav class="navbar navbar-expand-lg fixed-top bg-body-tertiary">
+        <div class="container">
+            <span class="navbar-brand">🚀 增强版文献数据AI分析报告</span>
+            <ul class="navbar-nav">
+$nav
+            </ul>
+        </div>
+    </nav>
+    <main class="container">
+$sections
+    </main>
+    <footer class="container text-center text-muted py-4">
+        <p>🕒 生成时间: $timestamp · 🤖 分析模型: $model · ⚡ Enhanced AI Analyzer v2.0</p>
+    </footer>
+</body>
+</html>""")
 
 class EnhancedGeminiAnalyzer:
     """增强版Gemini文献数据分析器"""
     
-    def __init__(self, api_key: str = None, proxy_url: str = "https://yunwu.ai"):
+    def __init__(self, api_key: str = None, proxy_url: str = "https://yunwu.ai",
+                 max_prompt_papers: int = DEFAULT_MAX_PROMPT_PAPERS, use_cache: bool = True,
+                 sectioned: bool = False):
         """
         初始化增强版Gemini分析器
         
         Args:
             api_key: Gemini API密钥
             proxy_url: 代理服务器地址
+            max_prompt_papers: 提示词中最多附带的文献条数
+            use_cache: 是否复用相同CSV内容已生成的分析报告
+            sectioned: 是否按章节并发生成报告，避免单次输出超出max_tokens被截断
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.proxy_url = proxy_url.rstrip('/')
         self.model_name = "gemini-2.5-pro"
+        self.max_prompt_papers = max(0, max_prompt_papers)
+        self.use_cache = use_cache
+        self.sectioned = sectioned
+        # 每个分析器实例独立的统计结果缓存，避免类级别lru_cache长期持有实例
+        self._load_stats_cached = functools.lru_cache(maxsize=STATS_CACHE_SIZE)(self._load_stats_uncached)
         
         if not self.api_key:
-            print("警告: 未找到GEMINI_API_KEY环境变量，请设置API密钥")
-            print("可以通过以下方式设置:")
-            print("export GEMINI_API_KEY='your_api_key_here'")
+            log.warning("警告: 未找到GEMINI_API_KEY环境变量，请设置API密钥")
+            log.warning("可以通过以下方式设置:")
+            log.warning("export GEMINI_API_KEY='your_api_key_here'")
         
         # 初始化OpenAI客户端，使用代理URL
+        # 共享的httpx连接池保持长连接，多次调用时复用TCP/TLS连接
         if self.api_key:
+            # 延迟导入，仅查看帮助信息等场景无需加载openai/httpx
+            import httpx
+            from openai import OpenAI
+            
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+                timeout=httpx.Timeout(600.0, connect=10.0)  # 生成完整报告耗时较长，读超时需放宽
+            )
             self.client = OpenAI(
                 api_key=self.api_key,
-                base_url=f"{self.proxy_url}/v1"
+                base_url=f"{self.proxy_url}/v1",
+                http_client=self.http_client
             )
         else:
+            self.http_client = None
             self.client = None
     
-    def load_csv_data(self, csv_file_path: str) -> List[Dict[str, Any]]:
+    def _warm_connection(self):
+        """向代理服务器发送一次轻量请求，提前完成TCP/TLS握手并把连接留在连接池中"""
+        try:
+            self.http_client.head(self.proxy_url, timeout=10.0)
+        except Exception:
+            pass  # 预热失败不影响后续分析，真正调用API时会重新建立连接
+    
+    def close(self):
+        """关闭HTTP连接池"""
+        if self.http_client is not None:
+            self.http_client.close()
+            self.http_client = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def load_csv_data(self, csv_file_path: str) -> Dict[str, List[str]]:
         """
-        从CSV文件加载文献数据
+        从CSV文件按列加载文献数据
+        
+        单次遍历CSV，将每行数据直接写入对应列的列表，不再为每行构建字典
         
         Args:
             csv_file_path: CSV文件路径
             
         Returns:
-            文献数据列表
+            列名到该列取值列表的映射
         """
         if not os.path.exists(csv_file_path):
             raise FileNotFoundError(f"CSV文件不存在: {csv_file_path}")
         
-        papers = []
+        columns = {name: [] for name in PAPER_COLUMNS}
         try:
-            with open(csv_file_path, 'r', encoding='utf-8-sig') as file:
-                reader = csv.DictReader(file)
+            with open(csv_file_path, 'r', encoding='utf-8-sig', newline='',
+                      buffering=CSV_READ_BUFFER_SIZE) as file:
+                reader = csv.reader(file)
+                header = next(reader, [])
+                header_index = {name: i for i, name in enumerate(header)}
+                # CSV中缺失的列指向表头之后的位置，取值时由补齐的空字符串填充
+                header_len = len(header)
+                indices = [header_index.get(name, header_len) for name in PAPER_COLUMNS]
+                min_row_len = max(indices) + 1
+                pick = itemgetter(*indices)
+                appends = [columns[name].append for name in PAPER_COLUMNS]
+                
                 for row in reader:
-                    papers.append(dict(row))
+                    if not row:
+                        continue
+                    if len(row) != header_len or min_row_len > header_len:
+                        # 字段数与表头不一致时截掉多余字段，并补齐缺失字段
+                        del row[header_len:]
+                        row.extend([''] * (min_row_len - len(row)))
+                    for append, value in zip(appends, pick(row)):
+                        append(value)
             
-            print(f"成功加载 {len(papers)} 条文献数据")
-            return papers
+            log.info("成功加载 %d 条文献数据", len(columns['题名']))
+            return columns
             
         except Exception as e:
             raise Exception(f"读取CSV文件时出错: {e}")
     
-    def preprocess_data(self, papers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def preprocess_data(self, columns: Dict[str, List[str]]) -> Dict[str, Any]:
         """
         预处理文献数据，生成详细统计信息
         
         Args:
-            papers: 文献数据列表
+            columns: 按列存储的文献数据
             
         Returns:
             预处理后的统计数据
         """
         stats = {
-            'total_papers': len(papers),
-            'years': [],
+            'total_papers': len(columns['题名']),
+            'year_min': None,
+            'year_max': None,
             'year_counts': {},
             'source_counts': {},
             'keyword_counts': {},
             'author_counts': {},
             'citation_stats': {'total': 0, 'max': 0, 'avg': 0, 'distribution': {}},
             'download_stats': {'total': 0, 'max': 0, 'avg': 0, 'distribution': {}},
-            'papers_data': []
+            'papers_preview': []
         }
         
-        all_keywords = []
-        all_authors = []
-        citations = []
-        downloads = []
-        
-        # 处理每篇文献
-        for i, paper in enumerate(papers, 1):
-            # 提取年份
-            date_str = paper.get('发表时间', '')
-            year = None
-            if date_str and len(date_str) >= 4:
-                try:
-                    year = int(date_str[:4])
-                    if 1900 <= year <= 2030:  # 合理的年份范围
-                        stats['years'].append(year)
-                        stats['year_counts'][year] = stats['year_counts'].get(year, 0) + 1
-                except:
-                    pass
-            
-            # 处理期刊
-            source = paper.get('来源', '').strip()
-            if source:
-                stats['source_counts'][source] = stats['source_counts'].get(source, 0) + 1
-            
-            # 处理关键词
-            keywords_str = paper.get('关键词', '')
-            paper_keywords = []
-            if keywords_str:
-                keywords = [k.strip() for k in keywords_str.replace('；', ';').replace(',', ';').split(';') if k.strip()]
-                paper_keywords = keywords
-                all_keywords.extend(keywords)
-            
-            # 处理作者
-            authors_str = paper.get('作者', '')
-            paper_authors = []
-            if authors_str:
-                authors = [a.strip() for a in authors_str.replace('；', ';').replace(',', ';').split(';') if a.strip()]
-                paper_authors = authors
-                all_authors.extend(authors)
-            
-            # 处理被引和下载次数
-            try:
-                citation_count = int(paper.get('被引', '0') or '0')
-                citations.append(citation_count)
-            except:
-                citations.append(0)
-            
-            try:
-                download_count = int(paper.get('下载', '0') or '0')
-                downloads.append(download_count)
-            except:
-                downloads.append(0)
-            
-            # 构建文献数据
-            paper_data = {
-                'id': i,
-                'title': paper.get('题名', 'N/A').strip(),
-                'authors': paper.get('作者', 'N/A').strip(),
-                'source': source or 'N/A',
-                'date': paper.get('发表时间', 'N/A').strip(),
-                'year': year,
-                'citations': citations[-1],
-                'downloads': downloads[-1],
-                'keywords': ', '.join(paper_keywords) if paper_keywords else 'N/A',
-                'abstract': (paper.get('摘要', '') or '').strip()[:300] + '...' if paper.get('摘要', '') else 'N/A',
-                'database': paper.get('数据库', 'N/A').strip(),
-                'funding': paper.get('基金资助', 'N/A').strip(),
-                'doi': paper.get('DOI', 'N/A').strip()
-            }
-            stats['papers_data'].append(paper_data)
-        
-        # 统计关键词和作者
-        for keyword in all_keywords:
-            stats['keyword_counts'][keyword] = stats['keyword_counts'].get(keyword, 0) + 1
-        
-        for author in all_authors:
-            stats['author_counts'][author] = stats['author_counts'].get(author, 0) + 1
+        # 按列提取年份和期刊，避免在逐行循环中做解析和计数
+        paper_years = [int(d[:4]) if len(d) >= 4 and d[:4].isdecimal() else None for d in columns['发表时间']]
+        year_counts = Counter(y for y in paper_years if y is not None and 1900 <= y <= 2030)  # 合理的年份范围
+        stats['year_counts'] = dict(sorted(year_counts.items()))
+        if year_counts:
+            stats['year_min'] = min(year_counts)
+            stats['year_max'] = max(year_counts)
+        
+        paper_sources = [s.strip() for s in columns['来源']]
+        stats['source_counts'] = Counter(filter(None, paper_sources))
+        
+        # 按列解析被引和下载次数，无法解析的记为0；由生成器直接填入紧凑的64位整数数组，不产生中间列表，sum/max直接遍历连续内存
+        citations = array('q', (int(c) if c.isdecimal() else 0 for c in map(str.strip, columns['被引'])))
+        downloads = array('q', (int(d) if d.isdecimal() else 0 for d in map(str.strip, columns['下载'])))
+        
+        # 文献明细只取提示词中附带的前几篇：先按列整理字段，再一次性组装为记录（字段顺序即输出顺序）
+        preview_count = min(self.max_prompt_papers, stats['total_papers'])
+        head = {name: columns[name][:preview_count] for name in PAPER_COLUMNS}
+        preview_columns = {
+            'id': range(1, preview_count + 1),
+            'title': [t.strip() for t in head['题名']],
+            'authors': [a.strip() for a in head['作者']],
+            'source': [s or 'N/A' for s in paper_sources[:preview_count]],
+            'date': [d.strip() for d in head['发表时间']],
+            'year': paper_years[:preview_count],
+            'citations': citations[:preview_count].tolist(),
+            'downloads': downloads[:preview_count].tolist(),
+            'keywords': [', '.join(_split(kw)) or 'N/A' for kw in head['关键词']],
+            'abstract': [a.strip()[:300] + '...' if a else 'N/A' for a in head['摘要']],
+            'database': [d.strip() for d in head['数据库']],
+            'funding': [f.strip() for f in head['基金资助']],
+            'doi': [d.strip() for d in head['DOI']]
+        }
+        stats['papers_preview'] = [dict(zip(preview_columns, values)) for values in zip(*preview_columns.values())]
+        
+        # 统计关键词和作者：整列拼接后一次性切分计数，不再逐篇切分再合并
+        stats['keyword_counts'] = Counter(_split(';'.join(columns['关键词'])))
+        stats['author_counts'] = Counter(_split(';'.join(columns['作者'])))
         
         # 计算被引和下载统计
         if citations:
-            stats['citation_stats']['total'] = sum(citations)
+            citation_total = sum(citations)
+            stats['citation_stats']['total'] = citation_total
             stats['citation_stats']['max'] = max(citations)
-            stats['citation_stats']['avg'] = round(sum(citations) / len(citations), 2)
-            
-            # 被引分布
-            citation_ranges = {'0': 0, '1-5': 0, '6-10': 0, '11-20': 0, '21-50': 0, '50+': 0}
-            for c in citations:
-                if c == 0:
-                    citation_ranges['0'] += 1
-                elif 1 <= c <= 5:
-                    citation_ranges['1-5'] += 1
-                elif 6 <= c <= 10:
-                    citation_ranges['6-10'] += 1
-                elif 11 <= c <= 20:
-                    citation_ranges['11-20'] += 1
-                elif 21 <= c <= 50:
-                    citation_ranges['21-50'] += 1
-                else:
-                    citation_ranges['50+'] += 1
-            stats['citation_stats']['distribution'] = citation_ranges
+            stats['citation_stats']['avg'] = round(citation_total / len(citations), 2)
+            
+            # 被引分布：先按取值计数，再按区间上界二分归档，避免逐篇走if-elif链
+            citation_ranges = [0] * len(CITATION_RANGE_LABELS)
+            for value, count in Counter(citations).items():
+                citation_ranges[bisect_left(CITATION_RANGE_BOUNDS, value)] += count
+            stats['citation_stats']['distribution'] = dict(zip(CITATION_RANGE_LABELS, citation_ranges))
         
         if downloads:
-            stats['download_stats']['total'] = sum(downloads)
+            download_total = sum(downloads)
+            stats['download_stats']['total'] = download_total
             stats['download_stats']['max'] = max(downloads)
-            stats['download_stats']['avg'] = round(sum(downloads) / len(downloads), 2)
+            stats['download_stats']['avg'] = round(download_total / len(downloads), 2)
         
         return stats
     
-    def generate_enhanced_prompt(self, stats: Dict[str, Any]) -> str:
+    def load_stats(self, csv_file_path: str) -> Dict[str, Any]:
         """
-        生成增强版分析提示词
+        加载CSV文件并生成统计数据
+        
+        结果按文件路径、修改时间和大小缓存，同一分析器重复分析未修改的文件时
+        （批量重跑、API出错后重试）直接复用，跳过解析和统计
+        
+        Args:
+            csv_file_path: CSV文件路径
+            
+        Returns:
+            预处理后的统计数据（与缓存共享，调用方不应修改）
+        """
+        if not os.path.exists(csv_file_path):
+            raise FileNotFoundError(f"CSV文件不存在: {csv_file_path}")
+        
+        file_stat = os.stat(csv_file_path)
+        return self._load_stats_cached(os.path.abspath(csv_file_path), file_stat.st_mtime_ns, file_stat.st_size)
+    
+    def _load_stats_uncached(self, csv_file_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+        """加载并预处理CSV文件，mtime_ns和size仅作为缓存键的一部分"""
+        log.info("📂 正在加载文献数据...")
+        columns = self.load_csv_data(csv_file_path)
+        
+        if not columns['题名']:
+            raise Exception("CSV文件中没有有效数据")
+        
+        log.info("⚙️ 正在进行数据预处理和统计分析...")
+        return self.preprocess_data(columns)
+    
+    def _format_year_range(self, stats: Dict[str, Any]) -> str:
+        """返回“起始年-结束年”形式的年份范围，没有年份数据时返回“未知”"""
+        return f"{stats['year_min']}-{stats['year_max']}" if stats['year_counts'] else "未知"
+    
+    def _format_sample_papers(self, stats: Dict[str, Any]) -> str:
+        """将示例文献转换为JSON字符串，并注明未列出的文献篇数"""
+        sample_papers = stats['papers_preview'][:self.max_prompt_papers]
+        papers_json_str = _dumps(sample_papers, indent=True)
+        omitted_count = stats['total_papers'] - len(sample_papers)
+        if omitted_count > 0:
+            papers_json_str += f"\n...（另有 {omitted_count} 篇未列出，请基于统计数据分析）"
+        return papers_json_str
+    
+    def _format_stats_block(self, stats: Dict[str, Any]) -> str:
+        """
+        生成提示词中的统计数据部分（数据统计总览 + 详细统计数据）
         
         Args:
             stats: 预处理的统计数据
             
         Returns:
-            增强版分析提示词
+            统计数据文本
         """
         # 获取TOP数据
-        top_sources = dict(list(sorted(stats['source_counts'].items(), key=lambda x: x[1], reverse=True)[:10]))
-        top_keywords = dict(list(sorted(stats['keyword_counts'].items(), key=lambda x: x[1], reverse=True)[:20]))
-        top_authors = dict(list(sorted(stats['author_counts'].items(), key=lambda x: x[1], reverse=True)[:10]))
+        top_sources = dict(stats['source_counts'].most_common(10))
+        top_keywords = dict(stats['keyword_counts'].most_common(TOP_KEYWORDS_IN_PROMPT))
+        top_authors = dict(stats['author_counts'].most_common(10))
         
-        year_range = f"{min(stats['years'])}-{max(stats['years'])}" if stats['years'] else "未知"
+        year_range = self._format_year_range(stats)
         
-        # 将papers_data转换为JSON字符串，避免f-string中的复杂表达式
-        papers_json_str = json.dumps(stats['papers_data'][:3], ensure_ascii=False, indent=2)
-        year_counts_str = json.dumps(dict(sorted(stats['year_counts'].items())), ensure_ascii=False)
-        top_sources_str = json.dumps(top_sources, ensure_ascii=False)
-        top_keywords_str = json.dumps(top_keywords, ensure_ascii=False)
-        top_authors_str = json.dumps(top_authors, ensure_ascii=False)
-        citation_dist_str = json.dumps(stats['citation_stats']['distribution'], ensure_ascii=False)
+        year_counts_str = _dumps(stats['year_counts'])
+        top_sources_str = _dumps(top_sources)
+        top_keywords_str = _dumps(top_keywords)
+        top_authors_str = _dumps(top_authors)
+        citation_dist_str = _dumps(stats['citation_stats']['distribution'])
         
-        prompt = f"""
-作为顶级学术文献数据分析专家和前端可视化工程师，请为以下CNKI文献数据生成一个专业级的、完整的HTML可视化分析报告。
-
-=== 数据统计总览 ===
+        return f"""=== 数据统计总览 ===
 📊 总文献数量: {stats['total_papers']}篇
 📅 发表年份范围: {year_range}
 📰 覆盖期刊数量: {len(stats['source_counts'])}种
@@ -244,14 +561,35 @@ class EnhancedGeminiAnalyzer:
 **期刊分布TOP10:**
 {top_sources_str}
 
-**高频关键词TOP20:**
+**高频关键词TOP{TOP_KEYWORDS_IN_PROMPT}（本地统计的真实频次）:**
 {top_keywords_str}
 
 **高产作者TOP10:**
 {top_authors_str}
 
 **被引分布区间:**
-{citation_dist_str}
+{citation_dist_str}"""
+    
+    def generate_enhanced_prompt(self, stats: Dict[str, Any]) -> str:
+        """
+        生成增强版分析提示词
+        
+        Args:
+            stats: 预处理的统计数据
+            
+        Returns:
+            增强版分析提示词
+        """
+        year_range = self._format_year_range(stats)
+        stats_block = self._format_stats_block(stats)
+        
+        # 将papers_preview转换为JSON字符串，避免f-string中的复杂表达式
+        papers_json_str = self._format_sample_papers(stats)
+        
+        prompt = f"""
+作为顶级学术文献数据分析专家和前端可视化工程师，请为以下CNKI文献数据生成一个专业级的、完整的HTML可视化分析报告。
+
+{stats_block}
 
 === HTML报告生成要求 ===
 
@@ -424,6 +762,65 @@ class EnhancedGeminiAnalyzer:
 """
         return prompt
     
+    def generate_section_prompts(self, stats: Dict[str, Any]) -> List[str]:
+        """
+        生成分段报告各章节的提示词，顺序与REPORT_SECTIONS一致
+        
+        Args:
+            stats: 预处理的统计数据
+            
+        Returns:
+            各章节的提示词列表
+        """
+        stats_block = self._format_stats_block(stats)
+        papers_json_str = self._format_sample_papers(stats)
+        
+        prompts = []
+        for section_id, title, requirements in REPORT_SECTIONS:
+            extra = ""
+            if section_id == 'literature':
+                extra = f"\n**示例数据结构:**\n{papers_json_str}\n"
+            prompts.append(f"""
+作为顶级学术文献数据分析专家和前端可视化工程师，请为以下CNKI文献数据生成HTML可视化分析报告中的「{title}」章节。
+
+{stats_block}
+{extra}
+=== 本章节生成要求 ===
+{requirements}
+=== 输出格式 ===
+1. 只输出一个 <section id="{section_id}"> ... </section> 片段，不要包含<html>、<head>、<body>标签，不要使用Markdown代码块
+2. 外壳页面已引入Bootstrap 5.3.0、Chart.js 4.4.0、DataTables 1.13.6（含jQuery）、wordcloud2.js和Font Awesome 6.4.0，并使用深色主题
+3. 本章节用到的JavaScript写在片段末尾的<script>中，元素ID统一以"{section_id}-"为前缀，避免与其他章节冲突
+4. 图表数据必须与上述统计结果准确对应，中文字符正确显示
+""")
+        return prompts
+    
+    def _completion_params(self, prompt: str) -> Dict[str, Any]:
+        """
+        构建对话补全请求参数
+        
+        Args:
+            prompt: 分析提示词
+            
+        Returns:
+            chat.completions.create 的关键字参数
+        """
+        return {
+            'model': self.model_name,
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "你是一位世界顶级的学术文献数据分析专家和全栈开发工程师，擅长使用现代前端技术生成专业级的学术可视化报告。你的任务是创建完整的、可独立运行的HTML文档，包含丰富的交互功能、美观的可视化图表和深度的学术分析内容。请确保生成的HTML代码完整、高质量、符合现代Web标准。"
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            'max_tokens': 8000,  # 增加token限制以生成更完整的HTML
+            'temperature': 0.2   # 降低随机性，提高生成质量和一致性
+        }
+    
     def call_gemini_api(self, prompt: str) -> str:
         """
         调用Gemini API进行分析
@@ -434,144 +831,212 @@ class EnhancedGeminiAnalyzer:
         Returns:
             分析结果
         """
+        return ''.join(self.stream_gemini_api(prompt))
+    
+    def stream_gemini_api(self, prompt: str) -> Iterator[str]:
+        """
+        以流式方式调用Gemini API，逐段返回生成内容
+        
+        Args:
+            prompt: 分析提示词
+            
+        Yields:
+            模型陆续返回的文本片段
+        """
         if not self.api_key:
             raise Exception("未设置GEMINI_API_KEY，无法调用API")
         
         try:
-            print("🚀 正在调用Gemini 2.5 Pro进行深度分析...")
-            print("💡 提示：生成完整HTML可视化报告可能需要2-3分钟，请耐心等待...")
-            
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一位世界顶级的学术文献数据分析专家和全栈开发工程师，擅长使用现代前端技术生成专业级的学术可视化报告。你的任务是创建完整的、可独立运行的HTML文档，包含丰富的交互功能、美观的可视化图表和深度的学术分析内容。请确保生成的HTML代码完整、高质量、符合现代Web标准。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=8000,  # 增加token限制以生成更完整的HTML
-                temperature=0.2   # 降低随机性，提高生成质量和一致性
-            )
+            log.info("🚀 正在调用Gemini 2.5 Pro进行深度分析...")
+            log.info("💡 提示：生成完整HTML可视化报告可能需要2-3分钟，请耐心等待...")
+            
+            # 流式返回，边生成边写入文件
+            stream = self.client.chat.completions.create(**self._completion_params(prompt), stream=True)
             
-            return response.choices[0].message.content
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
                 
         except Exception as e:
             raise Exception(f"API调用失败: {e}")
     
-    def save_analysis_report(self, analysis_result: str, output_file: str = None) -> str:
+    def call_gemini_api_batch(self, prompts: List[str], max_concurrency: int = DEFAULT_API_CONCURRENCY) -> List[str]:
+        """
+        并发调用Gemini API处理多个提示词
+        
+        Args:
+            prompts: 提示词列表
+            max_concurrency: 同时进行的最大请求数
+            
+        Returns:
+            与提示词一一对应的分析结果列表
+        """
+        if not self.api_key:
+            raise Exception("未设置GEMINI_API_KEY，无法调用API")
+        
+        try:
+            log.info("🚀 正在并发调用Gemini 2.5 Pro处理 %d 个请求...", len(prompts))
+            return asyncio.run(self._call_async(prompts, max_concurrency))
+        except Exception as e:
+            raise Exception(f"API调用失败: {e}")
+    
+    async def _call_async(self, prompts: List[str], max_concurrency: int) -> List[str]:
+        """使用AsyncOpenAI并发发送请求，信号量限制同时在途的请求数"""
+        import httpx
+        from openai import AsyncOpenAI
+        
+        client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=f"{self.proxy_url}/v1",
+            timeout=httpx.Timeout(600.0, connect=10.0)
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def call_one(prompt: str) -> str:
+            async with semaphore:
+                response = await client.chat.completions.create(**self._completion_params(prompt))
+                return response.choices[0].message.content
+        
+        try:
+            return await asyncio.gather(*(call_one(prompt) for prompt in prompts))
+        finally:
+            await client.close()
+    
+    def _section_cache_path(self, prompt: str) -> str:
+        """根据章节提示词计算章节片段的缓存文件路径"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{PROMPT_VERSION}|{self.model_name}|".encode('utf-8'))
+        digest.update(prompt.encode('utf-8'))
+        return os.path.join(SECTION_CACHE_DIR, f"{digest.hexdigest()}.html")
+    
+    def generate_sectioned_report(self, stats: Dict[str, Any]) -> str:
+        """
+        分章节并发生成报告并拼装为完整HTML
+        
+        提示词未变化的章节直接复用缓存的片段，只为其余章节调用API
+        
+        Args:
+            stats: 预处理的统计数据
+            
+        Returns:
+            完整的HTML报告
+        """
+        prompts = self.generate_section_prompts(stats)
+        fragments = [None] * len(prompts)
+        cache_paths = [self._section_cache_path(prompt) for prompt in prompts]
+        
+        if self.use_cache:
+            for index, cache_path in enumerate(cache_paths):
+                if os.path.exists(cache_path):
+                    with open(cache_path, 'r', encoding='utf-8') as file:
+                        # 空的缓存片段视为未生成，重新请求
+                        fragments[index] = file.read().strip() or None
+        
+        pending = [index for index, fragment in enumerate(fragments) if fragment is None]
+        if pending:
+            if self.use_cache:
+                os.makedirs(SECTION_CACHE_DIR, exist_ok=True)
+            # 返回为空的章节重新请求，只缓存有内容的片段，避免空章节被缓存后一直无法重新生成
+            missing = pending
+            for attempt in range(SECTION_ATTEMPTS):
+                if attempt:
+                    log.warning("⚠️ %d 个章节返回为空，正在重新生成...", len(missing))
+                results = self.call_gemini_api_batch([prompts[index] for index in missing])
+                for index, result in zip(missing, results):
+                    fragment = CODE_FENCE_RE.sub('', result or '').strip()
+                    if not fragment:
+                        continue
+                    fragments[index] = fragment
+                    if self.use_cache:
+                        with open(cache_paths[index], 'w', encoding='utf-8') as file:
+                            file.write(fragment)
+                missing = [index for index in missing if fragments[index] is None]
+                if not missing:
+                    break
+            else:
+                titles = '、'.join(REPORT_SECTIONS[index][1] for index in missing)
+                raise Exception(f"以下章节未返回内容: {titles}")
+        log.info("🧩 已生成 %d 个章节（复用缓存 %d 个）", len(fragments), len(fragments) - len(pending))
+        
+        nav = '\n'.join(
+            f'                <li class="nav-item"><a class="nav-link" href="#{section_id}">{html.escape(title)}</a></li>'
+            for section_id, title, _ in REPORT_SECTIONS
+        )
+        return SECTIONED_REPORT_TEMPLATE.safe_substitute(
+            nav=nav,
+            sections='\n'.join(fragments),
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            model=self.model_name
+        )
+    
+    def _default_output_file(self) -> str:
+        """生成带时间戳的默认报告文件名"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"enhanced_analysis_report_{timestamp}.html"
+    
+    def _cache_file_path(self, csv_file_path: str) -> str:
+        """
+        计算分析报告的缓存文件路径
+        
+        缓存键由CSV文件内容、提示词模板版本、模型名称、示例文献条数和生成方式共同决定
+        
+        Args:
+            csv_file_path: CSV文件路径
+            
+        Returns:
+            缓存文件路径
+        """
+        with open(csv_file_path, 'rb') as file:
+            digest = hashlib.file_digest(file, lambda: hashlib.blake2b(digest_size=16))
+        mode = 'sectioned' if self.sectioned else 'single'
+        digest.update(f"{PROMPT_VERSION}|{self.model_name}|{self.max_prompt_papers}|{mode}".encode('utf-8'))
+        return os.path.join(CACHE_DIR, f"{digest.hexdigest()}.html")
+    
+    def save_analysis_report(self, analysis_result: Union[str, Iterable[str]], output_file: str = None) -> str:
         """
         保存分析报告
         
         Args:
-            analysis_result: 分析结果
+            analysis_result: 分析结果，可以是完整字符串或流式返回的文本片段
             output_file: 输出文件路径
             
         Returns:
             保存的文件路径
         """
         if not output_file:
-            timestamp = __import__('datetime').datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = f"enhanced_analysis_report_{timestamp}.html"
+            output_file = self._default_output_file()
+        
+        if isinstance(analysis_result, str):
+            analysis_result = [analysis_result]
+        chunks = iter(analysis_result)
         
         try:
-            # 如果返回的是HTML代码，直接保存
-            if analysis_result.strip().startswith('<!DOCTYPE html') or analysis_result.strip().startswith('<html'):
-                with open(output_file, 'w', encoding='utf-8') as file:
-                    file.write(analysis_result)
+            # 先读取开头的片段，足够判断返回内容是否为HTML即可
+            head = ''
+            for chunk in chunks:
+                head += chunk
+                if len(head) >= HTML_SNIFF_WINDOW:
+                    break
+            prefix = head[:HTML_SNIFF_WINDOW].lstrip().lower()
+            
+            # 如果返回的是HTML代码，直接边接收边保存
+            if prefix.startswith(('<!doctype html', '<html')):
+                with open(output_file, 'wb', buffering=REPORT_WRITE_BUFFER_SIZE) as file:
+                    file.write(head.encode('utf-8'))
+                    for chunk in chunks:
+                        file.write(chunk.encode('utf-8'))
             else:
-                # 如果不是HTML，包装为HTML格式
-                html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>增强版文献数据AI分析报告</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            margin: 0;
-            padding: 20px;
-        }}
-        .container {{
-            background: rgba(255, 255, 255, 0.95);
-            padding: 40px;
-            border-radius: 15px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            backdrop-filter: blur(10px);
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        h1 {{
-            color: #2c3e50;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 15px;
-            margin-bottom: 30px;
-        }}
-        h2 {{
-            color: #34495e;
-            margin-top: 40px;
-            margin-bottom: 20px;
-        }}
-        .meta-info {{
-            background: linear-gradient(45deg, #f39c12, #f1c40f);
-            color: white;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 30px;
-        }}
-        .content {{
-            background: #f8f9fa;
-            padding: 25px;
-            border-radius: 10px;
-            border-left: 5px solid #3498db;
-        }}
-        pre {{
-            background: #2c3e50;
-            color: #ecf0f1;
-            padding: 20px;
-            border-radius: 8px;
-            overflow-x: auto;
-            font-size: 14px;
-        }}
-        .highlight {{
-            background: #3498db;
-            color: white;
-            padding: 2px 6px;
-            border-radius: 4px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🚀 增强版文献数据AI分析报告</h1>
-        <div class="meta-info">
-            <h3>📋 报告信息</h3>
-            <p><strong>🕒 生成时间:</strong> {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p><strong>🤖 分析模型:</strong> <span class="highlight">{self.model_name}</span></p>
-            <p><strong>⚡ 版本:</strong> Enhanced AI Analyzer v2.0</p>
-        </div>
-        <div class="content">
-            <h2>📄 分析内容</h2>
-            <pre>{analysis_result}</pre>
-        </div>
-        <div class="mt-4 text-center">
-            <p class="text-muted">💡 提示：如果内容不是HTML格式，请检查API响应或重新生成</p>
-        </div>
-    </div>
-</body>
-</html>"""
-                with open(output_file, 'w', encoding='utf-8') as file:
-                    file.write(html_content)
+                # 如果不是HTML，接收完整内容后包装为HTML格式
+                analysis_result = head + ''.join(chunks)
+                html_content = HTML_WRAPPER_TEMPLATE.safe_substitute(
+                    timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    model=self.model_name,
+                    content=html.escape(analysis_result)
+                )
+                with open(output_file, 'wb', buffering=REPORT_WRITE_BUFFER_SIZE) as file:
+                    file.write(html_content.encode('utf-8'))
             
-            print(f"✅ 分析报告已保存到: {output_file}")
+            log.info("✅ 分析报告已保存到: %s", output_file)
             return output_file
             
         except Exception as e:
@@ -589,46 +1054,118 @@ class EnhancedGeminiAnalyzer:
             分析报告文件路径
         """
         try:
-            print("🔄 开始增强版文献数据分析...")
+            log.info("🔄 开始增强版文献数据分析...")
             
-            # 1. 加载数据
-            print("📂 正在加载文献数据...")
-            papers = self.load_csv_data(csv_file_path)
+            # 0. 相同内容的CSV已分析过时直接复用缓存的报告
+            cache_file = None
+            if self.use_cache and os.path.exists(csv_file_path):
+                cache_file = self._cache_file_path(csv_file_path)
+                if os.path.exists(cache_file):
+                    report_file = output_file or self._default_output_file()
+                    shutil.copyfile(cache_file, report_file)
+                    log.info("♻️ 命中缓存，已复用此前生成的分析报告: %s", report_file)
+                    log.info("💡 提示：如需重新生成，请使用 --no-cache 参数")
+                    return report_file
             
-            if not papers:
-                raise Exception("CSV文件中没有有效数据")
+            # 1. 在后台预热到API服务器的连接，与数据加载并行
+            if self.http_client is not None:
+                threading.Thread(target=self._warm_connection, daemon=True).start()
             
-            # 2. 数据预处理
-            print("⚙️ 正在进行数据预处理和统计分析...")
-            stats = self.preprocess_data(papers)
+            # 2. 加载数据并预处理（文件未修改时复用已有统计结果）
+            stats = self.load_stats(csv_file_path)
             
             # 3. 生成增强版提示词
-            print("🎯 正在准备增强版分析提示词...")
-            prompt = self.generate_enhanced_prompt(stats)
-            
-            # 4. 调用AI分析
-            analysis_result = self.call_gemini_api(prompt)
+            log.info("🎯 正在准备增强版分析提示词...")
+            if self.sectioned:
+                # 4. 分章节并发调用AI分析，拼装为完整报告
+                analysis_result = self.generate_sectioned_report(stats)
+            else:
+                prompt = self.generate_enhanced_prompt(stats)
+                
+                # 4. 调用AI分析（流式返回）
+                analysis_result = self.stream_gemini_api(prompt)
             
-            # 5. 保存分析报告
+            # 5. 边接收边保存分析报告
             report_file = self.save_analysis_report(analysis_result, output_file)
             
-            print("\n" + "="*60)
-            print("🎉 增强版分析完成！")
-            print("="*60)
-            print(f"📊 分析了 {len(papers)} 条文献")
-            print(f"📅 年份范围: {min(stats['years']) if stats['years'] else '未知'} - {max(stats['years']) if stats['years'] else '未知'}")
-            print(f"📰 涉及期刊: {len(stats['source_counts'])} 种")
-            print(f"🔑 关键词数: {len(stats['keyword_counts'])} 个")
-            print(f"👥 作者人数: {len(stats['author_counts'])} 人")
-            print(f"📈 总被引数: {stats['citation_stats']['total']}")
-            print(f"📄 报告文件: {report_file}")
-            print("="*60)
+            if cache_file:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                shutil.copyfile(report_file, cache_file)
+            
+            if log.isEnabledFor(logging.INFO):
+                log.info("\n" + "="*60)
+                log.info("🎉 增强版分析完成！")
+                log.info("="*60)
+                log.info("📊 分析了 %d 条文献", stats['total_papers'])
+                log.info("📅 年份范围: %s - %s", stats['year_min'] or '未知', stats['year_max'] or '未知')
+                log.info("📰 涉及期刊: %d 种", len(stats['source_counts']))
+                log.info("🔑 关键词数: %d 个", len(stats['keyword_counts']))
+                log.info("👥 作者人数: %d 人", len(stats['author_counts']))
+                log.info("📈 总被引数: %d", stats['citation_stats']['total'])
+                log.info("📄 报告文件: %s", report_file)
+                log.info("="*60)
             
             return report_file
             
         except Exception as e:
-            print(f"❌ 分析过程中出错: {e}")
-            sys.exit(1)
+            log.error("❌ 分析过程中出错: %s", e)
+            raise
+    
+    def analyze_many(self, csv_files: List[str], output_dir: str = None,
+                     max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, str]:
+        """
+        并行分析多个CSV文件
+        
+        分析过程主要在等待API响应，使用线程池并共享同一个HTTP连接池
+        
+        Args:
+            csv_files: CSV文件路径列表
+            output_dir: 报告输出目录，默认为当前目录
+            max_workers: 并行线程数
+            
+        Returns:
+            分析成功的CSV文件路径到报告文件路径的映射
+        """
+        output_dir = output_dir or '.'
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # 不同目录下可能有同名的CSV文件，报告名重复时附加路径哈希，避免并行写入同一个报告互相覆盖
+        names = [os.path.splitext(os.path.basename(csv_file))[0] for csv_file in csv_files]
+        name_counts = Counter(name.lower() for name in names)
+        report_files = {}
+        for csv_file, name in zip(csv_files, names):
+            if name_counts[name.lower()] > 1:
+                path_hash = hashlib.blake2b(os.path.abspath(csv_file).encode('utf-8'), digest_size=4).hexdigest()
+                name = f"{name}_{path_hash}"
+            report_files[csv_file] = os.path.join(output_dir, f"{name}_analysis_report.html")
+        
+        reports = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.analyze, csv_file, report_file): csv_file
+                       for csv_file, report_file in report_files.items()}
+            for future in as_completed(futures):
+                try:
+                    reports[futures[future]] = future.result()
+                except Exception:
+                    pass  # 错误信息已由analyze输出，继续等待其余文件
+        
+        return reports
+
+def resolve_input_files(input_path: str) -> List[str]:
+    """
+    将输入参数解析为CSV文件列表
+    
+    Args:
+        input_path: 单个CSV文件、包含CSV文件的目录或通配符模式
+        
+    Returns:
+        CSV文件路径列表
+    """
+    if os.path.isdir(input_path):
+        return sorted(glob.glob(os.path.join(input_path, '*.csv')))
+    if any(char in input_path for char in '*?['):
+        return sorted(glob.glob(input_path))
+    return [input_path]
 
 def parse_arguments():
     """解析命令行参数"""
@@ -640,6 +1177,8 @@ def parse_arguments():
   python ai_analyze_enhanced.py -i cnki_papers_20250623_214224.csv
   python ai_analyze_enhanced.py -i data.csv -o my_enhanced_report.html
   python ai_analyze_enhanced.py -i data.csv --api-key your_key_here
+  python ai_analyze_enhanced.py -i exports/ -o reports/ --max-workers 4
+  python ai_analyze_enhanced.py -i data.csv --sectioned
 
 🌍 环境变量:
   GEMINI_API_KEY    Gemini API密钥
@@ -657,12 +1196,12 @@ def parse_arguments():
     parser.add_argument(
         '-i', '--input',
         required=True,
-        help='📂 输入的CSV文件路径'
+        help='📂 输入的CSV文件路径，也可以是目录或通配符（如 "exports/*.csv"）以批量分析'
     )
     
     parser.add_argument(
         '-o', '--output',
-        help='📄 输出分析报告的文件路径（可选，默认自动生成）'
+        help='📄 输出分析报告的文件路径（可选，默认自动生成）；批量分析时为报告输出目录（不存在时自动创建，不能是文件）'
     )
     
     parser.add_argument(
@@ -676,15 +1215,53 @@ def parse_arguments():
         help='🌐 代理服务器地址（默认: https://yunwu.ai）'
     )
     
+    parser.add_argument(
+        '--max-prompt-papers',
+        type=int,
+        default=DEFAULT_MAX_PROMPT_PAPERS,
+        help=f'📚 提示词中最多附带的文献条数（默认: {DEFAULT_MAX_PROMPT_PAPERS}）'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'🔁 忽略缓存，强制重新调用API生成报告（缓存目录: {CACHE_DIR}）'
+    )
+    
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f'🧵 批量分析多个CSV文件时的并行线程数（默认: {DEFAULT_MAX_WORKERS}）'
+    )
+    
+    parser.add_argument(
+        '--sectioned',
+        action='store_true',
+        help='🧩 按章节并发生成报告，避免单次输出过长被截断（未变化的章节复用缓存）'
+    )
+    
     return parser.parse_args()
 
 def main():
     """主函数"""
     args = parse_arguments()
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    
+    input_files = resolve_input_files(args.input)
+    if not input_files:
+        print(f"❌ 未找到CSV文件: {args.input}")
+        sys.exit(1)
+    
+    # 批量分析时-o是报告输出目录，不能是已有文件或HTML文件名
+    if len(input_files) > 1 and args.output and (
+            os.path.isfile(args.output) or args.output.lower().endswith(('.html', '.htm'))):
+        print(f"❌ 批量分析时 -o 需要指定报告输出目录，而不是文件: {args.output}")
+        sys.exit(1)
     
     print("🚀 增强版AI文献数据分析工具")
     print("="*50)
-    print(f"📂 输入文件: {args.input}")
+    print(f"📂 输入文件: {args.input}（共 {len(input_files)} 个）")
     print(f"🌐 代理地址: {args.proxy_url}")
     print(f"🤖 使用模型: gemini-2.5-pro")
     print(f"⚡ 版本: Enhanced v2.0")
@@ -694,13 +1271,25 @@ def main():
     # 创建增强版分析器
     analyzer = EnhancedGeminiAnalyzer(
         api_key=args.api_key,
-        proxy_url=args.proxy_url
+        proxy_url=args.proxy_url,
+        max_prompt_papers=args.max_prompt_papers,
+        use_cache=not args.no_cache,
+        sectioned=args.sectioned
     )
     
     # 执行分析
     try:
-        report_file = analyzer.analyze(args.input, args.output)
-        print(f"\n🎊 分析完成！增强版报告已保存到: {report_file}")
+        with analyzer:
+            if len(input_files) == 1:
+                report_file = analyzer.analyze(input_files[0], args.output)
+                print(f"\n🎊 分析完成！增强版报告已保存到: {report_file}")
+            else:
+                reports = analyzer.analyze_many(input_files, args.output, args.max_workers)
+                print(f"\n🎊 批量分析完成！成功 {len(reports)}/{len(input_files)} 个文件")
+                for csv_file, report_file in reports.items():
+                    print(f"  📄 {csv_file} -> {report_file}")
+                if len(reports) < len(input_files):
+                    sys.exit(1)
         print("💡 提示：用浏览器打开HTML文件查看完整的可视化报告")
         
     except KeyboardInterrupt:
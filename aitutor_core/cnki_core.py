@@ -1,238 +1,562 @@
-from playwright.sync_api import sync_playwright
-import time
+import asyncio
+import logging
+import os
+import queue
 import sys
+import threading
+from html.parser import HTMLParser
 from csv_tool import create_paper_csv_writer
 
-def extract_paper_info(page):
+log = logging.getLogger("aitutor")
+
+# 浏览器用户数据目录（位于项目根目录），保存HTTP缓存、Cookie等状态，后续运行无需重新下载
+BROWSER_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.pw_cache')
+
+# 等待页面元素出现的超时时间（毫秒），网络异常时尽快失败而不是一直阻塞
+SELECTOR_TIMEOUT = 5000
+
+# 抓取时不需要的资源类型（图片、字体、音视频、样式表），直接拦截以减少页面加载的数据量和渲染时间
+# 脚本需要保留，CNKI页面内容依赖脚本渲染
+BLOCKED_RESOURCE_TYPES = frozenset(('image', 'font', 'media', 'stylesheet'))
+
+# 同时打开的文献详情页数量，详情页抓取主要在等待网络，并发可以重叠等待时间
+DETAIL_CONCURRENCY = 8
+
+# 直接通过HTTP请求详情页时的最大并发数，不经过浏览器渲染，开销远小于打开标签页
+DETAIL_HTTP_CONCURRENCY = 16
+
+# 详情页中按元素ID提取文本的字段
+DETAIL_ELEMENT_IDS = ('ChDivSummary', 'ChDivKeyWord', 'ChDivFund', 'ChDivClassNo')
+
+# HTML中没有结束标签的空元素，解析时不计入嵌套深度
+VOID_ELEMENTS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                           'link', 'meta', 'source', 'track', 'wbr'))
+
+# 开始时会隐式结束未闭合<p>的元素（HTML允许省略</p>）
+P_CLOSING_TAGS = frozenset(('address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt',
+                            'fieldset', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                            'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+                            'table', 'ul'))
+
+# 检索结果列表中的文献条目
+RESULT_ROWS_SELECTOR = "table.result-table-list tbody tr"
+
+# 文献条目内各字段的选择器，页面脚本和逐行定位两种提取方式共用
+ROW_SELECTORS = {
+    'title': "td.name a.fz14",
+    'title_fallback': "td.name a",
+    'author': "td.author",
+    'source': "td.source",
+    'date': "td.date",
+    'database': "td.data span",
+    'quote': "td.quote a.quoteCnt",
+    'download': "td.download a.downloadCnt"
+}
+
+# 在页面内读取元素文本并去除首尾空白，只把去除空白后的文本传回，省去Python端再调用strip()
+TRIMMED_TEXT_JS = "element => element.textContent.trim()"
+TRIMMED_TEXTS_JS = "elements => elements.map(element => element.textContent.trim())"
+
+# 通过定位器提取列表时，题名以外的字段：(字段名, ROW_SELECTORS中的键, 缺失时的默认值)
+LOCATOR_FIELDS = (('作者', 'author', ""), ('来源', 'source', ""), ('发表时间', 'date', ""),
+                  ('数据库', 'database', ""), ('被引', 'quote', "0"), ('下载', 'download', "0"))
+
+# 列表页提取脚本返回的每行数据依次对应的字段
+PAPER_LIST_FIELDS = ('题名', '详情链接', '作者', '来源', '发表时间', '数据库', '被引', '下载')
+
+# 在列表页内对所有文献条目执行的提取脚本：每条返回与PAPER_LIST_FIELDS顺序一致的字符串数组
+# 没有题名的条目直接跳过，发表时间只保留日期部分（YYYY-MM-DD HH:MM -> YYYY-MM-DD）
+PAPER_ROWS_JS = """
+(rows, sel) => rows.flatMap(row => {
+    const text = selector => (row.querySelector(selector)?.textContent ?? '').trim();
+    const title = row.querySelector(sel.title) ?? row.querySelector(sel.title_fallback);
+    if (!title) return [];
+    return [[
+        title.textContent.trim(),
+        title.getAttribute('href'),
+        text(sel.author),
+        text(sel.source),
+        text(sel.date).split(' ')[0],
+        text(sel.database),
+        text(sel.quote) || '0',
+        text(sel.download) || '0'
+    ]];
+})
+"""
+
+# 判断页面内容是否已更新：选择器匹配的第一个元素的内容与之前不同
+# 用于翻页后等待新一页加载，以及点击摘要“更多”后等待完整摘要出现
+TEXT_CHANGED_JS = """
+([selector, previous]) => {
+    const element = document.querySelector(selector);
+    return element !== null && element.textContent !== previous;
+}
+"""
+
+# 在详情页内执行的提取脚本：返回所有带<p>的li.top-space条目的[条目全文, 第一个<p>的文本]
+DETAIL_ITEMS_JS = """
+() => Array.from(document.querySelectorAll('li.top-space'))
+    .filter(li => li.querySelector('p'))
+    .map(li => [li.textContent, li.querySelector('p').textContent.trim()])
+"""
+
+class CNKISession:
     """
-    从文献列表页面提取每条文献的基本信息，支持多页翻页
+    可在多次检索间复用的浏览器会话，首次使用时才启动Playwright和浏览器
+    
+    既可以用async with配合launch_cnki_async使用，也可以用with配合launch_cnki使用；
+    同步使用时会话拥有一个专用的事件循环，浏览器在多次launch_cnki调用之间保持打开
+    """
+    
+    def __init__(self, headless=False, user_data_dir=BROWSER_DATA_DIR):
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self._playwright = None
+        self._loop = None
+        self.context = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._loop is not None:
+            try:
+                self._loop.run_until_complete(self.close())
+            finally:
+                self._loop.close()
+                self._loop = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    def run(self, coroutine):
+        """
+        在会话的专用事件循环中运行协程（同步用法），Playwright对象只能在创建它们的事件循环中使用
+        
+        Args:
+            coroutine: 要运行的协程
+            
+        Returns:
+            协程的返回值
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coroutine)
+    
+    async def new_page(self):
+        """在共享的浏览器上下文中打开新页面，必要时先启动浏览器"""
+        if self.context is None:
+            # 延迟导入Playwright，避免仅导入本模块时加载浏览器驱动
+            from playwright.async_api import async_playwright
+            
+            self._playwright = await async_playwright().start()
+            # 启动浏览器（默认使用chromium），使用持久化的用户数据目录，跨运行复用缓存和Cookie
+            self.context = await self._playwright.chromium.launch_persistent_context(
+                self.user_data_dir, headless=self.headless
+            )
+            await self.context.route("**/*", _block_resources)
+        return await self.context.new_page()
+    
+    async def close(self):
+        """关闭浏览器并停止Playwright"""
+        if self.context is not None:
+            await self.context.close()
+            log.info("浏览器已关闭")
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = None
+        self.context = None
+
+class _DetailPageParser(HTMLParser):
+    """从详情页HTML中提取指定ID元素的文本，以及带<p>的li.top-space条目的全文和内容"""
+    
+    def __init__(self):
+        super().__init__()
+        self.elements = {}  # 元素ID -> 文本
+        self.items = []     # 带<p>的li.top-space条目: [(条目全文, 第一个<p>的文本), ...]，与DETAIL_ITEMS_JS的结果一致
+        self._open = []     # 当前未结束的标签栈
+        self._captures = [] # 正在收集文本的元素: [元素ID, 在标签栈中的位置, 文本片段列表]
+        self._item = None   # 当前li.top-space条目: [在标签栈中的位置, 全文片段, <p>片段, <p>在标签栈中的位置, <p>是否已结束]
+    
+    def handle_starttag(self, tag, attrs):
+        # HTML允许省略部分结束标签：新的<li>结束同一列表中未结束的<li>，块级元素结束未结束的<p>
+        if tag == 'li':
+            self._close_implied('li', ('ul', 'ol'))
+        if tag in P_CLOSING_TAGS:
+            self._close_implied('p', ('table', 'td', 'th', 'button'))
+        if tag in VOID_ELEMENTS:
+            return
+        position = len(self._open)
+        self._open.append(tag)
+        attrs = dict(attrs)
+        element_id = attrs.get('id')
+        if element_id in DETAIL_ELEMENT_IDS and element_id not in self.elements:
+            self._captures.append([element_id, position, []])
+        if self._item is None:
+            if tag == 'li' and 'top-space' in (attrs.get('class') or '').split():
+                self._item = [position, [], [], None, False]
+        elif tag == 'p' and self._item[3] is None:
+            self._item[3] = position
+    
+    def handle_endtag(self, tag):
+        # 结束标签同时结束其中所有未闭合的元素；找不到对应开始标签的多余结束标签直接忽略
+        for position in range(len(self._open) - 1, -1, -1):
+            if self._open[position] == tag:
+                self._close_to(position)
+                return
+    
+    def handle_data(self, data):
+        for capture in self._captures:
+            capture[2].append(data)
+        item = self._item
+        if item is not None:
+            item[1].append(data)
+            if item[3] is not None and not item[4]:
+                item[2].append(data)
+    
+    def close(self):
+        super().close()
+        # 文档结束时仍未闭合的元素视为已结束
+        self._close_to(0)
+    
+    def _close_implied(self, tag, boundaries):
+        """结束标签栈中最近的未闭合tag元素，遇到boundaries中的元素时停止查找"""
+        for position in range(len(self._open) - 1, -1, -1):
+            if self._open[position] == tag:
+                self._close_to(position)
+                return
+            if self._open[position] in boundaries:
+                return
+    
+    def _close_to(self, position):
+        """结束标签栈中position及其之后的所有元素，并完成这些元素中的文本收集"""
+        del self._open[position:]
+        remaining = []
+        for capture in self._captures:
+            if capture[1] < position:
+                remaining.append(capture)
+            else:
+                self.elements[capture[0]] = ''.join(capture[2]).strip()
+        self._captures = remaining
+        item = self._item
+        if item is not None:
+            if item[0] >= position:
+                # 与DETAIL_ITEMS_JS一致，只保留带<p>的条目
+                if item[3] is not None:
+                    self.items.append((''.join(item[1]), ''.join(item[2]).strip()))
+                self._item = None
+            elif item[3] is not None and item[3] >= position:
+                item[4] = True
+
+def _find_item(items, *keywords):
+    """
+    在详情页条目中查找包含任一关键字的第一个条目
+    
+    Args:
+        items: DETAIL_ITEMS_JS返回的或_DetailPageParser解析出的[条目全文, 内容]列表
+        keywords: 条目全文中要匹配的关键字
+        
+    Returns:
+        str: 条目内容，没有匹配的条目时返回空字符串
+    """
+    for text, value in items:
+        if any(keyword in text for keyword in keywords):
+            return value
+    return ""
+
+async def _block_resources(route):
+    """拦截不需要的资源请求，其余请求正常放行"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _wait_for(page, selector, timeout=SELECTOR_TIMEOUT):
+    """
+    等待元素出现
     
     Args:
         page: Playwright页面对象
+        selector: CSS选择器
+        timeout: 超时时间（毫秒）
         
     Returns:
-        list: 包含文献基本信息的列表
+        元素句柄，超时未出现时返回None
     """
-    all_papers = []
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
+    try:
+        return await page.wait_for_selector(selector, timeout=timeout)
+    except PlaywrightTimeoutError:
+        return None
+
+def cnki_session(headless=False):
+    """
+    创建可复用的浏览器会话，退出时自动关闭浏览器
+    
+    用法:
+        with cnki_session() as session:
+            for formula in formulas:
+                launch_cnki(formula, session=session)
+    
+        async with cnki_session() as session:
+            for formula in formulas:
+                await launch_cnki_async(formula, session=session)
+    
+    Args:
+        headless (bool): 是否以无头模式启动浏览器
+        
+    Returns:
+        CNKISession: 浏览器会话，同时支持with和async with
+    """
+    return CNKISession(headless=headless)
+
+def _locator_row_to_paper(title, link, values):
+    """
+    将定位器取出的一行文本整理为文献基本信息
+    
+    Args:
+        title: 题名
+        link: 详情链接
+        values: 与LOCATOR_FIELDS顺序一致的字段文本
+        
+    Returns:
+        dict: 文献基本信息
+    """
+    paper_info = {'题名': title, '详情链接': link}
+    for (field, _, default), value in zip(LOCATOR_FIELDS, values):
+        paper_info[field] = value or default
+    # 只保留日期部分（YYYY-MM-DD HH:MM -> YYYY-MM-DD）
+    paper_info['发表时间'] = paper_info['发表时间'].partition(' ')[0]
+    return paper_info
+
+async def _extract_rows_with_locators(page):
+    """
+    通过Playwright定位器提取当前页的文献信息，作为页面提取脚本执行出错时的备用方式
+    
+    Args:
+        page: Playwright页面对象
+        
+    Returns:
+        list: 当前页的文献基本信息列表
+    """
+    paper_rows = page.locator(RESULT_ROWS_SELECTOR)
+    count = await paper_rows.count()
+    
+    # 每个字段的列定位器每页只创建一次，并一次性取出整列去除空白后的文本
+    columns = {key: paper_rows.locator(ROW_SELECTORS[key])
+               for key in ('title',) + tuple(key for _, key, _ in LOCATOR_FIELDS)}
+    texts = {key: await column.evaluate_all(TRIMMED_TEXTS_JS) for key, column in columns.items()}
+    # 每列的元素数都等于条目数时，说明每个条目各字段恰好一个，各列按行对齐，直接按列组装
+    if count and all(len(column_texts) == count for column_texts in texts.values()):
+        links = await columns['title'].evaluate_all("links => links.map(link => link.getAttribute('href'))")
+        return [
+            _locator_row_to_paper(texts['title'][i], links[i],
+                                  [texts[key][i] for _, key, _ in LOCATOR_FIELDS])
+            for i in range(count)
+        ]
+    
+    # 有条目缺少某些字段时各列无法按行对齐，改为逐行逐字段定位
+    papers = []
+    for i in range(count):
+        try:
+            paper_row = paper_rows.nth(i)
+            
+            # 题名和详情链接，找不到时使用备用选择器；没有题名的条目跳过
+            title_element = paper_row.locator(ROW_SELECTORS['title'])
+            if await title_element.count() == 0:
+                title_element = paper_row.locator(ROW_SELECTORS['title_fallback'])
+                if await title_element.count() == 0:
+                    continue
+            title_element = title_element.first
+            
+            values = []
+            for _, key, _ in LOCATOR_FIELDS:
+                element = paper_row.locator(ROW_SELECTORS[key])
+                values.append(await element.first.evaluate(TRIMMED_TEXT_JS) if await element.count() > 0 else "")
+            
+            papers.append(_locator_row_to_paper(await title_element.evaluate(TRIMMED_TEXT_JS),
+                                                await title_element.get_attribute('href'), values))
+            
+        except Exception as e:
+            log.warning("提取第 %d 条文献信息时出错: %s", i + 1, e)
+    
+    return papers
+
+async def iter_paper_pages(page):
+    """
+    逐页抓取文献列表，每抓完一页立即返回该页文献的基本信息，调用方可以在翻页的同时处理已抓取的文献
+    
+    Args:
+        page: Playwright页面对象
+        
+    Yields:
+        list: 当前页的文献基本信息列表
+    """
+    total = 0
     current_page = 1
+    # 下一页按钮的定位器只创建一次，每次使用时Playwright都会重新查找元素，翻页后依然有效
+    next_page_button = page.locator("#PageNext, a.pagesnums[title*='下一页'], a[title*='下一页']")
     
     while True:
-        print(f"正在抓取第 {current_page} 页...")
+        log.info("正在抓取第 %d 页...", current_page)
         
         try:
             # 等待搜索结果加载
-            page.wait_for_selector(".result-table-list", timeout=10000)
-            time.sleep(3)
+            await page.wait_for_selector(".result-table-list", timeout=10000)
+            # 表格出现后等待条目渲染完成，而不是固定等待几秒
+            await _wait_for(page, RESULT_ROWS_SELECTOR)
             
-            # 获取当前页的所有文献条目 - 使用更精确的选择器定位tr元素
-            paper_rows = page.locator("table.result-table-list tbody tr")
-            count = paper_rows.count()
-            print(f"第 {current_page} 页找到 {count} 条文献")
+            # 在页面内一次性提取整页文献信息，避免逐行逐字段往返调用Playwright
+            try:
+                rows = await page.eval_on_selector_all(RESULT_ROWS_SELECTOR, PAPER_ROWS_JS, ROW_SELECTORS)
+                page_papers = [dict(zip(PAPER_LIST_FIELDS, row)) for row in rows]
+            except Exception as e:
+                # 提取脚本执行出错时，退回通过定位器逐行提取
+                log.warning("页面提取脚本出错，改为逐行提取: %s", e)
+                page_papers = await _extract_rows_with_locators(page)
+            log.info("第 %d 页找到 %d 条文献", current_page, len(page_papers))
             
-            if count == 0:
-                print("当前页没有找到文献，可能已到最后一页")
+            if not page_papers:
+                log.info("当前页没有找到文献，可能已到最后一页")
                 break
             
-            # 提取当前页的文献信息
-            for i in range(count):
-                try:
-                    paper_row = paper_rows.nth(i)
-                    paper_info = {}
-                    
-                    # 题名和详情链接 - 使用td.name下的a.fz14选择器
-                    title_element = paper_row.locator("td.name a.fz14")
-                    if title_element.count() > 0:
-                        paper_info['题名'] = title_element.text_content().strip()
-                        paper_info['详情链接'] = title_element.get_attribute('href')
-                    else:
-                        # 备用选择器
-                        title_element = paper_row.locator("td.name a")
-                        if title_element.count() > 0:
-                            paper_info['题名'] = title_element.first.text_content().strip()
-                            paper_info['详情链接'] = title_element.first.get_attribute('href')
-                        else:
-                            continue  # 如果没有题名，跳过这条记录
-                    
-                    # 作者 - 使用td.author选择器
-                    author_element = paper_row.locator("td.author")
-                    if author_element.count() > 0:
-                        paper_info['作者'] = author_element.text_content().strip()
-                    else:
-                        paper_info['作者'] = ""
-                    
-                    # 来源 - 使用td.source选择器
-                    source_element = paper_row.locator("td.source")
-                    if source_element.count() > 0:
-                        paper_info['来源'] = source_element.text_content().strip()
-                    else:
-                        paper_info['来源'] = ""
-                    
-                    # 发表时间 - 使用td.date选择器，只保留日期部分
-                    date_element = paper_row.locator("td.date")
-                    if date_element.count() > 0:
-                        full_date = date_element.text_content().strip()
-                        # 提取日期部分，去掉时间部分（格式：YYYY-MM-DD HH:MM -> YYYY-MM-DD）
-                        if ' ' in full_date:
-                            paper_info['发表时间'] = full_date.split(' ')[0]
-                        else:
-                            paper_info['发表时间'] = full_date
-                    else:
-                        paper_info['发表时间'] = ""
-                    
-                    # 数据库 - 使用td.data span选择器
-                    data_element = paper_row.locator("td.data span")
-                    if data_element.count() > 0:
-                        paper_info['数据库'] = data_element.text_content().strip()
-                    else:
-                        paper_info['数据库'] = ""
-                    
-                    # 被引次数 - 使用td.quote a.quoteCnt选择器
-                    quote_element = paper_row.locator("td.quote a.quoteCnt")
-                    if quote_element.count() > 0:
-                        paper_info['被引'] = quote_element.text_content().strip()
-                    else:
-                        paper_info['被引'] = "0"
-                    
-                    # 下载次数 - 使用td.download a.downloadCnt选择器
-                    download_element = paper_row.locator("td.download a.downloadCnt")
-                    if download_element.count() > 0:
-                        paper_info['下载'] = download_element.text_content().strip()
-                    else:
-                        paper_info['下载'] = "0"
-                    
-                    all_papers.append(paper_info)
-                    print(f"已提取第 {len(all_papers)} 条文献: {paper_info['题名'][:50]}...")
-                    
-                except Exception as e:
-                    print(f"提取第 {i+1} 条文献信息时出错: {e}")
-                    continue
+            # 提取当前页的文献信息；静默时跳过逐条日志，不必逐条拼接消息
+            if log.isEnabledFor(logging.INFO):
+                for offset, paper_info in enumerate(page_papers, total + 1):
+                    log.info("已提取第 %d 条文献: %.50s...", offset, paper_info['题名'])
+            total += len(page_papers)
+            yield page_papers
             
             # 检查是否有下一页，并点击下一页按钮
-            next_page_button = page.locator("#PageNext, a.pagesnums[title*='下一页'], a[title*='下一页']")
-            if next_page_button.count() > 0 and next_page_button.is_enabled():
+            if await next_page_button.count() > 0 and await next_page_button.is_enabled():
                 try:
-                    print(f"正在翻到第 {current_page + 1} 页...")
-                    next_page_button.click()
-                    time.sleep(3)  # 等待页面加载
+                    log.info("正在翻到第 %d 页...", current_page + 1)
+                    # 记下当前页第一条的内容，点击后等到它变化即说明新一页已加载
+                    first_row = await page.eval_on_selector(RESULT_ROWS_SELECTOR, "row => row.textContent")
+                    await next_page_button.click()
+                    await page.wait_for_function(TEXT_CHANGED_JS, arg=[RESULT_ROWS_SELECTOR, first_row], timeout=10000)
                     current_page += 1
                 except Exception as e:
-                    print(f"翻页时出错: {e}")
+                    log.error("翻页时出错: %s", e)
                     break
             else:
-                print("没有更多页面，抓取完成")
+                log.info("没有更多页面，抓取完成")
                 break
                 
         except Exception as e:
-            print(f"处理第 {current_page} 页时出错: {e}")
+            log.error("处理第 %d 页时出错: %s", current_page, e)
             break
     
-    print(f"总共抓取了 {len(all_papers)} 条文献")
-    return all_papers
+    log.info("总共抓取了 %d 条文献", total)
 
-def extract_paper_details(page, detail_url):
+async def extract_paper_info(page):
     """
-    从文献详情页面提取详细信息
+    从文献列表页面提取每条文献的基本信息，支持多页翻页
     
     Args:
         page: Playwright页面对象
+        
+    Returns:
+        list: 包含文献基本信息的列表
+    """
+    all_papers = []
+    async for page_papers in iter_paper_pages(page):
+        all_papers.extend(page_papers)
+    return all_papers
+
+async def extract_paper_details(context, detail_url):
+    """
+    在新标签页中打开文献详情页面并提取详细信息，多篇文献可并发提取
+    
+    Args:
+        context: Playwright浏览器上下文对象
         detail_url: 文献详情页面URL
         
     Returns:
         dict: 包含文献详细信息的字典
     """
     details = {}
+    page = None
     
     try:
         # 导航到详情页面
         if not detail_url.startswith('http'):
             detail_url = "https://kns.cnki.net" + detail_url
         
-        page.goto(detail_url)
-        page.wait_for_load_state()
-        time.sleep(2)
+        page = await context.new_page()
+        # 页面结构就绪即可读取，不必等待所有图片、脚本等资源加载完成
+        await page.goto(detail_url, wait_until='domcontentloaded')
         
         # 摘要 - 优先使用ChDivSummary ID选择器
         abstract_element = page.locator("#ChDivSummary")
-        if abstract_element.count() > 0:
+        if await abstract_element.count() > 0:
             # 检查是否有"更多"按钮，如果有则点击获取完整摘要
             more_button = page.locator("#ChDivSummaryMore")
-            if more_button.count() > 0 and more_button.is_visible():
+            if await more_button.count() > 0 and await more_button.is_visible():
                 try:
-                    print("发现摘要'更多'按钮，正在点击获取完整摘要...")
-                    more_button.click()
-                    time.sleep(1)  # 等待内容加载
+                    log.info("发现摘要'更多'按钮，正在点击获取完整摘要...")
+                    # 记下点击前的摘要，等到内容变化即说明完整摘要已加载，而不是固定等待
+                    brief = await abstract_element.first.text_content()
+                    await more_button.click()
+                    await page.wait_for_function(TEXT_CHANGED_JS, arg=["#ChDivSummary", brief],
+                                                 timeout=SELECTOR_TIMEOUT)
                 except Exception as e:
-                    print(f"点击'更多'按钮时出错: {e}")
+                    log.warning("点击'更多'按钮时出错: %s", e)
             
             # 获取摘要内容
-            details['摘要'] = abstract_element.first.text_content().strip()
+            details['摘要'] = await abstract_element.first.evaluate(TRIMMED_TEXT_JS)
         else:
             # 备用选择器
             abstract_element = page.locator(".abstract-text, .brief")
-            if abstract_element.count() > 0:
-                details['摘要'] = abstract_element.first.text_content().strip()
+            if await abstract_element.count() > 0:
+                details['摘要'] = await abstract_element.first.evaluate(TRIMMED_TEXT_JS)
             else:
                 details['摘要'] = ""
         
         # 关键词 - 优先使用ChDivKeyWord ID选择器
         keywords_element = page.locator("#ChDivKeyWord")
-        if keywords_element.count() > 0:
-            details['关键词'] = keywords_element.first.text_content().strip()
+        if await keywords_element.count() > 0:
+            details['关键词'] = await keywords_element.first.evaluate(TRIMMED_TEXT_JS)
         else:
             # 备用选择器
             keywords_element = page.locator(".keywords, .keyword")
-            if keywords_element.count() > 0:
-                details['关键词'] = keywords_element.first.text_content().strip()
+            if await keywords_element.count() > 0:
+                details['关键词'] = await keywords_element.first.evaluate(TRIMMED_TEXT_JS)
             else:
                 details['关键词'] = ""
 
-        # 基金资助 - 使用li元素中包含"基金"或"资助"的选择器
-        fund_element = page.locator("li.top-space:has-text('基金') p, li.top-space:has-text('资助') p")
-        if fund_element.count() > 0:
-            details['基金资助'] = fund_element.first.text_content().strip()
-        else:
+        # 基金资助、专辑、专题、分类号、DOI都在li.top-space条目中，在页面内一次性取出所有条目
+        items = await page.evaluate(DETAIL_ITEMS_JS)
+        
+        # 基金资助 - 使用li元素中包含"基金"或"资助"的条目
+        details['基金资助'] = _find_item(items, '基金', '资助')
+        if not details['基金资助']:
             # 备用选择器
             fund_element = page.locator("#ChDivFund")
-            if fund_element.count() > 0:
-                details['基金资助'] = fund_element.first.text_content().strip()
-            else:
-                details['基金资助'] = ""
-
-        # 专辑 - 使用li元素中包含"专辑"的选择器
-        album_element = page.locator("li.top-space:has-text('专辑：') p")
-        if album_element.count() > 0:
-            details['专辑'] = album_element.first.text_content().strip()
-        else:
-            details['专辑'] = ""
-
-        # 专题 - 使用li元素中包含"专题"的选择器  
-        topic_element = page.locator("li.top-space:has-text('专题：') p")
-        if topic_element.count() > 0:
-            details['专题'] = topic_element.first.text_content().strip()
-        else:
-            details['专题'] = ""
-
-        # 分类号 - 使用li元素中包含"分类号"的选择器
-        classification_element = page.locator("li.top-space:has-text('分类号：') p")
-        if classification_element.count() > 0:
-            details['分类号'] = classification_element.first.text_content().strip()
-        else:
+            if await fund_element.count() > 0:
+                details['基金资助'] = await fund_element.first.evaluate(TRIMMED_TEXT_JS)
+        
+        # 专辑、专题 - 使用li元素中包含"专辑"、"专题"的条目
+        details['专辑'] = _find_item(items, '专辑：')
+        details['专题'] = _find_item(items, '专题：')
+        
+        # 分类号 - 使用li元素中包含"分类号"的条目
+        details['分类号'] = _find_item(items, '分类号：')
+        if not details['分类号']:
             # 备用选择器
             classification_element = page.locator("#ChDivClassNo")
-            if classification_element.count() > 0:
-                details['分类号'] = classification_element.first.text_content().strip()
-            else:
-                details['分类号'] = ""
-
-        # DOI - 使用li元素中包含"DOI"的选择器
-        doi_element = page.locator("li.top-space:has-text('DOI：') p")
-        if doi_element.count() > 0:
-            details['DOI'] = doi_element.first.text_content().strip()
-        else:
-            details['DOI'] = ""
-            
+            if await classification_element.count() > 0:
+                details['分类号'] = await classification_element.first.evaluate(TRIMMED_TEXT_JS)
+        
+        # DOI - 使用li元素中包含"DOI"的条目
+        details['DOI'] = _find_item(items, 'DOI：')
+        
     except Exception as e:
-        print(f"提取文献详细信息时出错: {e}")
+        log.error("提取文献详细信息时出错: %s", e)
         details = {
             '摘要': "",
             '关键词': "",
@@ -243,108 +567,261 @@ def extract_paper_details(page, detail_url):
             'DOI': ""
         }
     
+    finally:
+        # 每篇文献使用独立的标签页，提取完成后关闭
+        if page is not None:
+            await page.close()
+    
     return details
 
-def launch_cnki(search_formula=None):
+async def fetch_paper_details_http(client, detail_url):
     """
-    使用Playwright启动cnki.net网站，搜索并提取文献信息
+    直接通过HTTP请求文献详情页并解析详细信息，不经过浏览器渲染
+    
+    Args:
+        client: 携带浏览器Cookie的httpx.AsyncClient
+        detail_url: 文献详情页面URL
+        
+    Returns:
+        dict: 包含文献详细信息的字典；请求失败或页面中没有详情内容
+            （如遇到反爬验证页）时返回None，由调用方改用浏览器提取
+    """
+    if not detail_url.startswith('http'):
+        detail_url = "https://kns.cnki.net" + detail_url
+    
+    # 请求或解析出现任何错误（如链接无效、反爬页面HTML格式异常）都只影响这一篇文献，改用浏览器提取
+    try:
+        response = await client.get(detail_url)
+        response.raise_for_status()
+        parser = _DetailPageParser()
+        parser.feed(response.text)
+        parser.close()
+    except Exception as e:
+        log.info("直接请求详情页失败，改用浏览器提取: %s", e)
+        return None
+    
+    elements = parser.elements
+    if 'ChDivSummary' not in elements and 'ChDivKeyWord' not in elements:
+        return None
+    
+    return {
+        '摘要': elements.get('ChDivSummary', ""),
+        '关键词': elements.get('ChDivKeyWord', ""),
+        '基金资助': _find_item(parser.items, '基金', '资助') or elements.get('ChDivFund', ""),
+        '专辑': _find_item(parser.items, '专辑：'),
+        '专题': _find_item(parser.items, '专题：'),
+        '分类号': _find_item(parser.items, '分类号：') or elements.get('ChDivClassNo', ""),
+        'DOI': _find_item(parser.items, 'DOI：')
+    }
+
+async def _create_detail_client(context, page):
+    """
+    创建携带浏览器Cookie和User-Agent的HTTP客户端，用于直接请求详情页
+    
+    Args:
+        context: Playwright浏览器上下文对象
+        page: 已完成检索的Playwright页面对象
+        
+    Returns:
+        httpx.AsyncClient: HTTP客户端
+    """
+    import httpx
+    
+    cookies = {cookie['name']: cookie['value'] for cookie in await context.cookies()}
+    headers = {
+        'User-Agent': await page.evaluate("navigator.userAgent"),
+        'Referer': 'https://kns.cnki.net/'
+    }
+    return httpx.AsyncClient(cookies=cookies, headers=headers, follow_redirects=True,
+                             timeout=httpx.Timeout(30.0, connect=10.0))
+
+def _writer_loop(paper_queue, csv_writer):
+    """
+    写入线程：从队列中逐条取出文献写入CSV，收到None时结束
+    
+    Args:
+        paper_queue: 待写入文献的queue.Queue
+        csv_writer: PaperCSVWriter实例
+    """
+    while True:
+        paper = paper_queue.get()
+        if paper is None:
+            return
+        csv_writer.write_paper(paper)
+
+async def launch_cnki_async(search_formula=None, session=None, resume_file=None):
+    """
+    使用Playwright启动cnki.net网站，搜索并提取文献信息（异步版本）
     
     Args:
         search_formula (str): 要填入搜索框的检索式
+        session (CNKISession): 可选的浏览器会话，多次检索时传入以复用同一个浏览器；
+            不提供时自动启动浏览器，并在结束后关闭
+        resume_file (str): 可选的已有CSV文件名，提供时续写该文件，并跳过其中已保存的文献
     """
     if not search_formula:
-        print("错误：未提供搜索式")
+        log.error("错误：未提供搜索式")
         return
         
-    print("将使用以下检索式:")
-    print(search_formula)
+    log.info("将使用以下检索式:\n%s", search_formula)
     
     # 初始化CSV写入器
-    csv_writer = create_paper_csv_writer()
+    csv_writer = create_paper_csv_writer(resume_file)
+    
+    # 未传入会话时由本次调用独占浏览器，结束后关闭
+    owns_session = session is None
+    if owns_session:
+        session = CNKISession()
+    
+    page = await session.new_page()
     
-    with sync_playwright() as p:
-        # 启动浏览器（默认使用chromium）
-        browser = p.chromium.launch(headless=False)
+    try:
+        # 导航到cnki.net
+        await page.goto("https://kns.cnki.net/kns8s/AdvSearch")
+        log.info("成功导航到cnki.net")
         
-        # 创建新的上下文和页面
-        context = browser.new_context()
-        page = context.new_page()
+        # 切换到专业检索（等待标签出现，而不是固定等待页面加载）
+        major_search = await _wait_for(page, "li[name='majorSearch']")
+        if major_search:
+            await major_search.click()
         
-        try:
-            # 导航到cnki.net
-            page.goto("https://kns.cnki.net/kns8s/AdvSearch")
-            print("成功导航到cnki.net")
+        # 定位文本框并输入搜索式
+        text_area = await _wait_for(page, "textarea.textarea-major.majorSearch.ac_input")
+        if text_area:
+            await text_area.fill(search_formula)
+    
+            # 点击检索按钮
+            search_button = await _wait_for(page, "input.btn-search")
+            if search_button is None:
+                log.error("未找到检索按钮")
+                return
+            await search_button.click()
             
-            # 等待页面加载
-            time.sleep(3)
+            log.info("正在搜索...")
             
-            # 切换到专业检索
-            major_search = page.locator("li[name='majorSearch']")
-            if major_search.count() > 0:
-                major_search.click()
-                time.sleep(1)
+            # 信号量限制同时进行的请求和打开的详情页数量，既重叠网络等待，又避免请求过于频繁
+            http_semaphore = asyncio.Semaphore(DETAIL_HTTP_CONCURRENCY)
+            browser_semaphore = asyncio.Semaphore(DETAIL_CONCURRENCY)
+            client = None
+            tasks = []
+            scheduled_urls = set()
+            skipped = 0
             
-            # 定位文本框并输入搜索式
-            text_area = page.locator("textarea.textarea-major.majorSearch.ac_input")
-            if text_area.count() > 0:
-                text_area.fill(search_formula)
-                time.sleep(1)
-        
-                # 点击检索按钮
-                search_button = page.locator("input.btn-search")
-                search_button.click()
-                
-                print("正在搜索...")
-                time.sleep(5)  # 等待搜索结果加载
-                
-                # 提取文献基本信息
-                papers = extract_paper_info(page)
-                
-                if not papers:
-                    print("未找到文献，请检查搜索条件")
+            async def fetch_details(paper):
+                # 移除详情链接字段（不需要保存到CSV）
+                detail_url = paper.pop('详情链接', None)
+                if detail_url:
+                    # 单篇文献出错时只保存列表页信息，不影响其他文献
+                    try:
+                        # 详情页优先直接用HTTP请求，失败时再打开浏览器标签页
+                        async with http_semaphore:
+                            details = await fetch_paper_details_http(client, detail_url)
+                        if details is None:
+                            async with browser_semaphore:
+                                details = await extract_paper_details(session.context, detail_url)
+                        # 合并基本信息和详细信息
+                        paper.update(details)
+                    except Exception as e:
+                        log.error("提取文献详细信息时出错，只保存基本信息: %.50s: %s", paper.get('题名', ''), e)
+                return paper
+            
+            # CSV写入（包括批量刷新到磁盘）交给单独的线程，不阻塞详情页的网络请求
+            paper_queue = queue.Queue()
+            writer_thread = threading.Thread(target=_writer_loop, args=(paper_queue, csv_writer), daemon=True)
+            writer_thread.start()
+            completed = 0
+            
+            def queue_paper(task):
+                # 每篇文献的详情提取一完成就交给写入线程，翻页过程中中断时已提取的文献也会保存
+                nonlocal completed
+                if task.cancelled() or task.exception() is not None:
                     return
+                completed += 1
+                log.info("\n已完成第 %d 条文献...", completed)
+                paper_queue.put(task.result())
+            
+            try:
+                # 逐页提取文献基本信息（其中会等待搜索结果加载），每抓完一页立即开始提取该页文献的
+                # 详细信息，与后续翻页同时进行
+                async for page_papers in iter_paper_pages(page):
+                    if client is None:
+                        # 检索完成后再读取Cookie，确保包含检索会话的状态
+                        client = await _create_detail_client(session.context, page)
+                    for paper in page_papers:
+                        # 跳过CSV中已保存的文献，以及本次检索中重复出现的详情链接，不再重复抓取详情页
+                        detail_url = paper.get('详情链接')
+                        if csv_writer.seen(paper) or (detail_url and detail_url in scheduled_urls):
+                            skipped += 1
+                            continue
+                        if detail_url:
+                            scheduled_urls.add(detail_url)
+                        task = asyncio.create_task(fetch_details(paper))
+                        task.add_done_callback(queue_paper)
+                        tasks.append(task)
                 
-                print(f"\n开始提取 {len(papers)} 条文献的详细信息...")
+                if skipped:
+                    log.info("跳过 %d 条已保存或重复的文献", skipped)
                 
-                # 为每条文献提取详细信息并立即写入CSV
-                for i, paper in enumerate(papers):
-                    print(f"\n处理第 {i+1}/{len(papers)} 条文献...")
-                    
-                    if paper.get('详情链接'):
-                        details = extract_paper_details(page, paper['详情链接'])
-                        # 合并基本信息和详细信息
-                        paper.update(details)
-                    
-                    # 移除详情链接字段（不需要保存到CSV）
-                    paper.pop('详情链接', None)
-                    
-                    # 立即写入CSV文件
-                    csv_writer.write_paper(paper)
-                    
-                    # 添加延时，避免请求过于频繁
-                    time.sleep(1)
+                if not tasks:
+                    if not skipped:
+                        log.warning("未找到文献，请检查搜索条件")
+                    return
                 
-                print(f"\n数据提取完成！")
-                print(f"共处理 {csv_writer.get_count()} 条文献")
-                print(f"CSV文件保存位置: {csv_writer.get_filepath()}")
+                log.info("\n共 %d 条文献，已完成 %d 条，正在等待其余文献的详细信息...", len(tasks), completed)
+                await asyncio.gather(*tasks)
+            finally:
+                # 出错时取消尚未完成的详情提取
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if client is not None:
+                    await client.aclose()
+                # 通知写入线程结束，并等待队列中的文献全部写入
+                paper_queue.put(None)
+                await asyncio.to_thread(writer_thread.join)
+            
+            log.info("\n数据提取完成！")
+            log.info("共处理 %d 条文献", csv_writer.get_count())
+            log.info("CSV文件保存位置: %s", csv_writer.get_filepath())
+            if owns_session:
                 print("按下回车键关闭浏览器...")
-                input()
-            else:
-                print("未找到搜索文本框")
-                
-        except Exception as e:
-            print(f"执行过程中出错: {e}")
-            print(f"已保存 {csv_writer.get_count()} 条文献到CSV文件")
-        
-        finally:
+                await asyncio.to_thread(input)
+        else:
+            log.error("未找到搜索文本框")
+            
+    except Exception as e:
+        log.error("执行过程中出错: %s", e)
+        log.info("已保存 %d 条文献到CSV文件", csv_writer.get_count())
+    
+    finally:
+        csv_writer.close()
+        if owns_session:
             # 关闭浏览器
-            browser.close()
-            print("浏览器已关闭")
+            await session.close()
+        else:
+            await page.close()
+
+def launch_cnki(search_formula=None, resume_file=None, session=None):
+    """
+    使用Playwright启动cnki.net网站，搜索并提取文献信息
+    
+    Args:
+        search_formula (str): 要填入搜索框的检索式
+        resume_file (str): 可选的已有CSV文件名，提供时续写该文件，并跳过其中已保存的文献
+        session (CNKISession): 可选的浏览器会话（通过with cnki_session()创建），多次检索时传入以复用同一个浏览器；
+            不提供时自动启动浏览器，并在结束后关闭
+    """
+    coroutine = launch_cnki_async(search_formula, session=session, resume_file=resume_file)
+    if session is None:
+        asyncio.run(coroutine)
+    else:
+        session.run(coroutine)
 
 if __name__ == "__main__":
     # 如果直接运行此脚本并提供搜索式作为命令行参数
     if len(sys.argv) > 1:
+        logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
         search_formula = sys.argv[1]
         launch_cnki(search_formula)
     else:
-        print("请通过运行search_formula.py提供搜索式作为参数")
\ No newline at end of file
+        print("请通过运行search_formula.py提供搜索式作为参数")
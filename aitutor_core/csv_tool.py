@@ -1,18 +1,27 @@
 import csv
+import logging
 import os
-from datetime import datetime
+import time
+from operator import itemgetter
+
+log = logging.getLogger("aitutor")
+
+# 项目根目录，CSV文件保存在这里；导入时计算一次，不必每次创建写入器时重新计算
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 缓冲的记录条数，攒够后一次性写入并刷新到磁盘
+WRITE_BATCH_SIZE = 50
 
 class PaperCSVWriter:
     """文献CSV文件写入器，支持逐条写入数据"""
     
     def __init__(self, filename=None):
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
             filename = f"cnki_papers_{timestamp}.csv"
         
         # 确保文件保存在项目根目录
-        project_root = os.path.dirname(os.path.dirname(__file__))
-        self.filepath = os.path.join(project_root, filename)
+        self.filepath = os.path.join(_PROJECT_ROOT, filename)
         
         # CSV列名
         self.fieldnames = [
@@ -20,37 +29,85 @@ class PaperCSVWriter:
             '摘要', '关键词', '基金资助', '专辑', '专题', '分类号', 'DOI'
         ]
         
+        # 缺失字段的默认值，以及按列顺序一次取出所有字段的取值函数
+        self._defaults = dict.fromkeys(self.fieldnames, "")
+        self._row_getter = itemgetter(*self.fieldnames)
+        
         self.paper_count = 0
-        self._initialize_csv()
+        self._buffer = []
+        
+        # 已保存过的文献（按题名、作者、发表时间区分）；指定的文件已存在时续写该文件，
+        # 并读取其中的文献，重新检索时跳过这些文献
+        self._seen = set()
+        append = bool(filename) and os.path.exists(self.filepath)
+        if append:
+            self._load_seen()
+        self._initialize_csv(append)
+    
+    @staticmethod
+    def _key(paper_data):
+        """文献的去重键：题名、作者、发表时间"""
+        return (paper_data.get('题名', ''), paper_data.get('作者', ''), paper_data.get('发表时间', ''))
+    
+    def _load_seen(self):
+        """读取已有CSV文件中的文献，记录为已保存"""
+        with open(self.filepath, newline='', encoding='utf-8-sig') as f:
+            self._seen = {self._key(row) for row in csv.DictReader(f)}
+        log.info("已读取 %d 条已保存的文献: %s", len(self._seen), self.filepath)
     
-    def _initialize_csv(self):
-        """初始化CSV文件，写入表头"""
+    def _initialize_csv(self, append=False):
+        """
+        初始化CSV文件，写入表头
+        
+        Args:
+            append: 是否续写已有文件（不再写入表头）
+        """
         try:
-            with open(self.filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
-                writer.writeheader()
-            print(f"CSV文件已创建: {self.filepath}")
+            # 文件在写入器的整个生命周期内保持打开，复用同一个csv.writer，避免每条记录都重新打开文件
+            self._file = open(self.filepath, 'a' if append else 'w', newline='', encoding='utf-8-sig')
+            self._writer = csv.writer(self._file)
+            if append:
+                log.info("继续写入CSV文件: %s", self.filepath)
+            else:
+                self._writer.writerow(self.fieldnames)
+                self._file.flush()
+                log.info("CSV文件已创建: %s", self.filepath)
         except Exception as e:
-            print(f"初始化CSV文件时出错: {e}")
+            log.error("初始化CSV文件时出错: %s", e)
             raise
     
     def write_paper(self, paper_data):
         """写入单条文献数据到CSV文件"""
         try:
-            with open(self.filepath, 'a', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
-                
-                # 确保所有字段都存在
-                row = {}
-                for field in self.fieldnames:
-                    row[field] = paper_data.get(field, "")
-                
-                writer.writerow(row)
-                self.paper_count += 1
-                print(f"已保存第 {self.paper_count} 条文献到CSV: {paper_data.get('题名', 'N/A')[:50]}...")
-                
+            # 按列顺序整理字段，缺失的字段留空
+            self._buffer.append(self._row_getter({**self._defaults, **paper_data}))
+            self._seen.add(self._key(paper_data))
+            if len(self._buffer) >= WRITE_BATCH_SIZE:
+                self.flush()
+            self.paper_count += 1
+            log.info("已保存第 %d 条文献到CSV: %.50s...", self.paper_count, paper_data.get('题名', 'N/A'))
+            
         except Exception as e:
-            print(f"写入CSV文件时出错: {e}")
+            log.error("写入CSV文件时出错: %s", e)
+    
+    def seen(self, paper_data):
+        """
+        判断文献是否已保存在CSV文件中
+        
+        Args:
+            paper_data: 至少包含题名、作者、发表时间的文献信息字典
+            
+        Returns:
+            bool: 已保存过时返回True
+        """
+        return self._key(paper_data) in self._seen
+    
+    def flush(self):
+        """将缓冲的记录写入CSV文件并刷新到磁盘"""
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
     
     def get_filepath(self):
         """获取CSV文件路径"""
@@ -62,15 +119,25 @@ class PaperCSVWriter:
     
     def close(self):
         """关闭CSV写入器（清理资源）"""
-        print(f"CSV写入完成，共保存 {self.paper_count} 条文献记录")
-        print(f"文件位置: {self.filepath}")
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        log.info("CSV写入完成，共保存 %d 条文献记录", self.paper_count)
+        log.info("文件位置: %s", self.filepath)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 def create_paper_csv_writer(filename=None):
     """
     创建文献CSV写入器的工厂函数
     
     Args:
-        filename: 可选的文件名，如果不提供则自动生成
+        filename: 可选的文件名，如果不提供则自动生成；文件已存在时续写，并跳过其中已保存的文献
         
     Returns:
         PaperCSVWriter: CSV写入器实例
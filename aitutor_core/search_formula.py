@@ -1,5 +1,7 @@
 import argparse
-import cnki_core 
+import logging
+import shutil
+import sys
 def parse_search_arguments():
     """
     通过命令行参数获取用户输入的作者(AU)和作者单位(AF)信息
@@ -17,6 +19,18 @@ def parse_search_arguments():
     parser.add_argument('-AF', '--affiliation', type=str,
                         help='输入作者单位，例如: 北京大学')
     
+    # 清空浏览器缓存后再检索，可选
+    parser.add_argument('--fresh', action='store_true',
+                        help='清空浏览器缓存和Cookie（项目根目录下的.pw_cache）后重新开始')
+    
+    # 续写已有的CSV文件，跳过其中已保存的文献，可选
+    parser.add_argument('--resume', type=str, metavar='FILE',
+                        help='续写项目根目录下已有的CSV文件，跳过已保存的文献，例如: cnki_papers_20250101_120000.csv')
+    
+    # 只输出警告和错误，不显示逐条抓取进度，可选
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='安静模式，只输出警告和错误信息')
+    
     # 解析命令行参数
     args = parser.parse_args()
     
@@ -51,12 +65,21 @@ def generate_search_formula(args):
 def main():
     """主函数"""
     args = parse_search_arguments()
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO,
+                        format='%(message)s', stream=sys.stdout)
     search_formula = generate_search_formula(args)
     
     print("生成的检索式:")
     print(search_formula)
     
-    cnki_core.launch_cnki(search_formula)
+    # 解析完参数后再导入抓取模块，查看帮助或参数有误时不必加载
+    import cnki_core
+    
+    if args.fresh:
+        shutil.rmtree(cnki_core.BROWSER_DATA_DIR, ignore_errors=True)
+        print("已清空浏览器缓存")
+    
+    cnki_core.launch_cnki(search_formula, resume_file=args.resume)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file